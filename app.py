@@ -6,14 +6,24 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 from datetime import datetime, timedelta, timezone
 import time
-import re
 import traceback
+import os
+import hashlib
+import threading
+import queue
+import re
+import bisect
+from types import MappingProxyType
+from array import array
 
 # --- Configuration ---
 st.set_page_config(layout="wide", page_title="Lichess Insights", page_icon="♟️")
@@ -25,11 +35,43 @@ PERF_TYPE_OPTIONS_SINGLE = ['Bullet', 'Blitz', 'Rapid']
 DEFAULT_PERF_TYPE = 'Bullet'
 DEFAULT_RATED_ONLY = True
 ECO_CSV_PATH = "eco_to_opening.csv" # Assumes the file is in the root directory
+DISK_CACHE_DIR = "cache" # Parquet copies of processed game tables, survive restarts / st.cache_data eviction
+DISK_CACHE_TTL = 3600 # Seconds a disk entry is served as fresh (matches st.cache_data ttl)
+DISK_CACHE_MAX_STALE = 24 * 3600 # Older entries are refetched synchronously instead of served stale
+DISK_CACHE_VERSION = 3 # Part of the cache key; bump whenever the processed columns change
+DAY_NAMES = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"] # Monday = 0, as in pandas dayofweek
+TIME_AXES = {'dow': 'DayOfWeekName', 'hour': 'Hour', 'dom': 'Day', 'year': 'Year'} # time_axis_aggregates key -> calendar column
 TITLES_TO_ANALYZE = ['GM', 'IM', 'FM', 'CM', 'WGM', 'WIM', 'WFM', 'WCM', 'NM']
+# Everything the five "vs Titled" plots read; the titled subset carries only these instead of the full-width frame
+TITLED_VIEW_COLUMNS = ['Date', 'PlayerElo', 'PlayerColor', 'PlayerResultString', 'PlayerResultNumeric', 'OpeningName_API'] # + OpponentName, attached by the filter
+_TITLE_RE = re.compile(r'^(?:' + '|'.join(TITLES_TO_ANALYZE) + r')\s+') # Leading title in a player name, e.g. 'GM Foo'
+# Time-control buckets on estimated game duration (base + 40 * increment seconds): >0 Bullet, >=180 Blitz, >=480 Rapid, >=1500 Classical
+_TC_THRESHOLDS = (0, 180, 480, 1500)
+_TC_LABELS = ('Unknown', 'Bullet', 'Blitz', 'Rapid', 'Classical')
+# Per-game lookups used inside the API loop (built once, not per game)
+_TERM_MAP = {"mate":"Normal","resign":"Normal","stalemate":"Normal","timeout":"Time forfeit","draw":"Normal","outoftime":"Time forfeit","cheat":"Cheat","noStart":"Aborted","unknownFinish":"Unknown","variantEnd":"Variant End"}
+_RESULT_MAP = {'white': "1-0", 'black': "0-1"} # Anything else (no winner) is "1/2-1/2"
+_DRAW_STATUSES = frozenset(['draw', 'stalemate'])
+# Low-cardinality string columns stored as pandas categoricals (codes instead of Python strings for groupby/value_counts);
+# the title-stripped opponent names (opponent_names) are built the same way on first use
+CATEGORICAL_COLUMNS = ['Event', 'Variant', 'Speed', 'Status', 'PerfType', 'Termination', 'TimeControl', 'ECO', 'OpeningName_API', 'OpeningName_Custom',
+                       'PlayerColor', 'PlayerResultString', 'OpponentTitle', 'DayOfWeekName', 'TimeControl_Category', 'Result', 'PlayerID']
+# High-cardinality free text (names, game ids) is built straight into Arrow string arrays: contiguous buffers, no per-row PyObjects
+ARROW_STRING = 'string[pyarrow]'
+_INT16_MAX = np.iinfo(np.int16).max # Ratings / ply counts are stored as int16; larger values are rejected, not wrapped
+# Bar charts are read, not explored: render them as static images (no Plotly.js interaction layer / modebar per chart)
+STATIC_CHART_CONFIG = {'staticPlot': True, 'displayModeBar': False}
 
+# =============================================
+# Helper Function: Strip Title Prefix from Opponent Names (lazy)
+# =============================================
 # =============================================
 # Helper Function: Categorize Time Control (Corrected Syntax)
 # =============================================
+def _tc_bucket(total):
+    """Maps an estimated duration in seconds to its category with one C-level bisect."""
+    return _TC_LABELS[bisect.bisect_right(_TC_THRESHOLDS, total)] if total > 0 else 'Unknown'
+
 def categorize_time_control(tc_str, speed_info):
     """Categorizes time control based on speed info or parsed string."""
     if isinstance(speed_info, str) and speed_info in ['bullet', 'blitz', 'rapid', 'classical', 'correspondence']:
@@ -41,22 +83,12 @@ def categorize_time_control(tc_str, speed_info):
             parts = tc_str.split('+')
             if len(parts) == 2:
                 base = int(parts[0]); increment = int(parts[1])
-                total = base + 40 * increment
-                if total >= 1500: return 'Classical';
-                if total >= 480: return 'Rapid';
-                if total >= 180: return 'Blitz';
-                if total > 0 : return 'Bullet';
-                return 'Unknown'
+                return _tc_bucket(base + 40 * increment)
             else: return 'Unknown'
         except (ValueError, IndexError): return 'Unknown'
     else:
         try:
-            base = int(tc_str)
-            if base >= 1500: return 'Classical';
-            if base >= 480: return 'Rapid';
-            if base >= 180: return 'Blitz';
-            if base > 0 : return 'Bullet';
-            return 'Unknown'
+            return _tc_bucket(int(tc_str))
         except ValueError:
             tc_lower = tc_str.lower()
             if 'classical' in tc_lower: return 'Classical';
@@ -65,22 +97,36 @@ def categorize_time_control(tc_str, speed_info):
             if 'bullet' in tc_lower: return 'Bullet';
             return 'Unknown'
 
+def categorize_time_control_series(tc_series, speed_series):
+    """Vectorized categorize_time_control over whole columns; only unparsable leftovers hit the scalar path."""
+    speed_cap = speed_series.where(speed_series.isin(['bullet', 'blitz', 'rapid', 'classical', 'correspondence'])).str.capitalize()
+    parts = tc_series.str.split('+', n=1, expand=True)
+    base = pd.to_numeric(parts[0], errors='coerce').to_numpy(dtype=float)
+    incr = pd.to_numeric(parts[1], errors='coerce').to_numpy(dtype=float) if parts.shape[1] > 1 else np.full(len(tc_series), np.nan)
+    total = np.where(tc_series.str.contains('+', regex=False, na=False).to_numpy(), base + 40 * incr, base) # NaN when unparsable
+    category = np.select([total >= 1500, total >= 480, total >= 180, total > 0], ['Classical', 'Rapid', 'Blitz', 'Bullet'], default='Unknown')
+    result = speed_cap.combine_first(pd.Series(np.where(np.isnan(total), None, category), index=tc_series.index, dtype=object))
+    leftover = result.isna()
+    if leftover.any(): result[leftover] = tc_series[leftover].map(lambda tc: categorize_time_control(tc, None)) # e.g. 'Correspondence', '-'
+    return result
+
 # =============================================
 # Helper Function: Load ECO to Opening Mapping
 # =============================================
-@st.cache_data
+@st.cache_resource(show_spinner=False)
 def load_eco_mapping(csv_path):
-    """Loads the ECO code to custom opening name mapping from a CSV file."""
+    """Loads the ECO code to custom opening name mapping from a CSV file (read-only, shared by all sessions)."""
     try:
-        df_eco = pd.read_csv(csv_path)
         # Adjust column names if they are different in your actual CSV
-        if "ECO Code" not in df_eco.columns or "Opening Name" not in df_eco.columns:
+        try: df_eco = pd.read_csv(csv_path, engine='pyarrow', usecols=['ECO Code', 'Opening Name'])
+        except KeyError: # pyarrow raises ArrowKeyError (a KeyError) for a missing usecols column
             st.error(f"ECO mapping file '{csv_path}' must contain 'ECO Code' and 'Opening Name' columns.")
             return {}
-        eco_map = df_eco.drop_duplicates(subset=['ECO Code']).set_index('ECO Code')['Opening Name'].to_dict()
+        df_eco = df_eco.drop_duplicates(subset=['ECO Code']) # Keep the first name per code
+        eco_map = dict(zip(df_eco['ECO Code'], df_eco['Opening Name']))
         # Use sidebar for status messages to avoid cluttering main area at startup
         st.sidebar.success(f"Loaded {len(eco_map)} ECO mappings.")
-        return eco_map
+        return MappingProxyType(eco_map) # cache_resource hands out the same object everywhere, so guard it against mutation
     except FileNotFoundError:
         st.sidebar.error(f"ECO file '{csv_path}' not found. Custom names unavailable.")
         return {}
@@ -91,165 +137,353 @@ def load_eco_mapping(csv_path):
 # =============================================
 # API Data Loading and Processing Function
 # =============================================
-@st.cache_data(ttl=3600)
-def load_from_lichess_api(username: str, time_period_key: str, perf_type: str, rated: bool, eco_map: dict):
-    """ Fetches and processes Lichess games. """
-    # ... (Function code identical to version 13/14) ...
-    if not username: st.warning("Please enter a Lichess username."); return pd.DataFrame()
-    if not perf_type: st.warning("Please select a game type."); return pd.DataFrame()
+@st.cache_resource(show_spinner=False) # No spinner: also called from the background refresh thread
+def get_http_session():
+    """Process-wide pooled session (keep-alive + gzip) reused across calls; a module global would be rebuilt on every rerun."""
+    session = requests.Session()
+    # No 429 here: Lichess asks clients to wait a full minute after one, so it surfaces as "API Request Failed" instead of a quick retry
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retries))
+    return session
+
+def iter_ndjson(response, chunk_size=1 << 16, prefetch=16):
+    """Yields raw NDJSON lines (bytes) from a streamed response; orjson parses bytes directly, so no decode pass.
+    A reader thread keeps pulling (and gunzipping) up to `prefetch` chunks ahead, so the download overlaps parsing."""
+    chunks = queue.Queue(maxsize=prefetch); stop = threading.Event(); end = object()
+    def put(item):
+        while not stop.is_set():
+            try: chunks.put(item, timeout=0.5); return True
+            except queue.Full: pass
+        return False
+    def reader():
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk and not put(chunk): return # Consumer gave up
+            put(end)
+        except Exception as e: put(e) # Re-raised on the consumer side (e.g. requests errors reach the loader's handler)
+    threading.Thread(target=reader, daemon=True).start()
+    pending = b''
+    try:
+        while (chunk := chunks.get()) is not end:
+            if isinstance(chunk, Exception): raise chunk
+            lines = (pending + chunk).split(b'\n'); pending = lines.pop()
+            yield from lines
+    finally: stop.set()
+    if pending: yield pending
+
+def calendar_fields_from_ms(ms):
+    """Year/Month/Day/Hour/DayOfWeek (UTC) straight from epoch-ms int64 via numpy integer/datetime64 arithmetic (no .dt accessors)."""
+    days = ms // 86_400_000; d = days.astype('datetime64[D]'); m = d.astype('datetime64[M]'); y = d.astype('datetime64[Y]')
+    dow = ((days + 3) % 7).astype(np.int8) # 1970-01-01 was a Thursday (Monday = 0)
+    return {'Year': (y.astype(np.int64) + 1970).astype(np.int16), 'Month': ((m - y).astype(np.int64) + 1).astype(np.int8),
+            'Day': ((d - m).astype(np.int64) + 1).astype(np.int8), 'Hour': ((ms // 3_600_000) % 24).astype(np.int8),
+            'DayOfWeekNum': dow, 'DayOfWeekName': pd.Categorical.from_codes(dow, categories=DAY_NAMES)}
+
+def analysis_key(username, time_period_key, perf_type, rated):
+    """Identifies one loaded analysis (a plain string so it survives parquet metadata round-trips)."""
+    return f"{username.lower()}|{time_period_key}|{perf_type}|{rated}"
+
+def fetch_start_date(time_period_key):
+    """UTC start of the selected period, or None for an unknown key."""
+    time_delta = TIME_PERIOD_OPTIONS.get(time_period_key)
+    return datetime.now(timezone.utc) - time_delta if time_delta else None
+
+def _fetch_games(username: str, time_period_key: str, perf_type: str, rated: bool, eco_map):
+    """ Fetches and processes Lichess games straight from the API (no caching, no UI: also runs on the background refresh thread).
+    Returns (df, skipped_entries); request errors propagate to the caller. """
     username_lower = username.lower()
-    st.info(f"Fetching games for '{username}' ({time_period_key} | Type: {perf_type})...")
-    since_timestamp_ms = None; time_delta = TIME_PERIOD_OPTIONS.get(time_period_key)
-    if time_delta: start_date = datetime.now(timezone.utc) - time_delta; since_timestamp_ms = int(start_date.timestamp() * 1000); st.caption(f"Fetching since: {start_date.strftime('%Y-%m-%d %H:%M:%S UTC')}")
-    else: st.warning("Invalid time period.") # Should not be reached
+    player_name = None # The account's real casing, taken from the first game that matches case-insensitively; plain == after that
+    since_timestamp_ms = None; start_date = fetch_start_date(time_period_key)
+    if start_date: since_timestamp_ms = int(start_date.timestamp() * 1000)
     api_params = {"rated":str(rated).lower(), "perfType":perf_type.lower(), "opening":"true", "moves":"false", "tags":"false", "pgnInJson":"false" }
     if since_timestamp_ms: api_params["since"] = since_timestamp_ms
-    api_url = f"https://lichess.org/api/games/user/{username}"; headers = {"Accept":"application/x-ndjson"}
-    all_games_data = []; error_counter = 0
+    api_url = f"https://lichess.org/api/games/user/{username}"; headers = {"Accept":"application/x-ndjson", "Accept-Encoding":"gzip"}
+    error_counter = 0
+    # Column buffers (struct-of-arrays): one list / typed array per output column, filled in lockstep per game
+    # Ratings / plies fit int16 and results (0 / 0.5 / 1) are exact in float32: narrow buffers, and the frame borrows them as-is
+    dates_ms=array('q'); white_elos=array('h'); black_elos=array('h'); player_elos=array('h'); opp_elos=array('h'); ply_counts=array('h'); res_nums=array('f')
+    events=[]; whites=[]; blacks=[]; results=[]; ecos=[]; op_names_api=[]; op_names_custom=[]; time_controls=[]; terminations=[]; game_ids=[]
+    player_colors=[]; opp_names_raw=[]; opp_titles=[]; res_strs=[]; variants=[]; speeds=[]; statuses=[]; perf_types=[]
+    response = get_http_session().get(api_url, params=api_params, headers=headers, stream=True, timeout=(5, 60)); response.raise_for_status()
+    for line in iter_ndjson(response):
+        if line:
+            game_data = None
+            try:
+                game_data = orjson.loads(line)
+                white_info=game_data.get('players',{}).get('white',{}); black_info=game_data.get('players',{}).get('black',{})
+                white_user=white_info.get('user',{}); black_user=black_info.get('user',{})
+                opening_info=game_data.get('opening',{}); clock_info=game_data.get('clock')
+                game_id=game_data.get('id','N/A'); created_at_ms=game_data.get('createdAt')
+                variant=game_data.get('variant','standard'); speed=game_data.get('speed','unknown')
+                perf=game_data.get('perf','unknown'); status=game_data.get('status','unknown'); winner=game_data.get('winner')
+                white_name=white_user.get('name','Unknown'); black_name=black_user.get('name','Unknown')
+                white_title=white_user.get('title'); black_title=black_user.get('title')
+                white_rating=pd.to_numeric(white_info.get('rating'),errors='coerce')
+                black_rating=pd.to_numeric(black_info.get('rating'),errors='coerce')
+                player_color,player_side,player_elo,opp_name_raw,opp_title_raw,opp_elo=(None,None,None,'Unknown',None,None)
+                if player_name is None:
+                    if white_name.lower()==username_lower: player_name=white_name
+                    elif black_name.lower()==username_lower: player_name=black_name
+                if white_name==player_name: player_color,player_side,player_elo,opp_name_raw,opp_title_raw,opp_elo=('White','white',white_rating,black_name,black_title,black_rating)
+                elif black_name==player_name: player_color,player_side,player_elo,opp_name_raw,opp_title_raw,opp_elo=('Black','black',black_rating,white_name,white_title,white_rating)
+                else: continue
+                if player_color is None or pd.isna(player_elo) or pd.isna(opp_elo): continue
+                res_num,res_str=(0.5,"Draw")
+                if status not in _DRAW_STATUSES:
+                   if winner==player_side: res_num,res_str=(1,"Win")
+                   elif winner is not None: res_num,res_str=(0,"Loss")
+                tc_str="Unknown"
+                if clock_info is not None:
+                    init=clock_info.get('initial'); incr=clock_info.get('increment')
+                    if init is not None and incr is not None: tc_str=f"{init}+{incr}"
+                elif speed=='correspondence': tc_str="Correspondence"
+                eco=opening_info.get('eco','Unknown'); op_name_api=opening_info.get('name','Unknown Opening').replace('?','').split(':')[0].strip()
+                op_name_custom=eco_map.get(eco, f"ECO: {eco}" if eco!='Unknown' else 'Unknown Opening') # Use loaded map
+                term=_TERM_MAP.get(status,"Unknown")
+                opp_title_final='Unknown'
+                if opp_title_raw and opp_title_raw.strip():
+                    opp_title_clean=opp_title_raw.replace(' ','').strip().upper()
+                    if opp_title_clean and opp_title_clean!='?': opp_title_final=opp_title_clean
+                # Convert everything that can raise *before* touching the buffers so columns never get out of step
+                white_elo_int=int(white_rating) if not pd.isna(white_rating) else 0; black_elo_int=int(black_rating) if not pd.isna(black_rating) else 0
+                player_elo_int=int(player_elo); opp_elo_int=int(opp_elo); ply=int(game_data.get('turns',0) or 0); created_ms=created_at_ms if isinstance(created_at_ms,int) else -1 # -1 = missing date, dropped after the loop
+                if min(white_elo_int, black_elo_int, player_elo_int, opp_elo_int, ply) < 0 or max(white_elo_int, black_elo_int, player_elo_int, opp_elo_int, ply) > _INT16_MAX: raise OverflowError("value out of int16 range") # Counted as a skipped entry
+                dates_ms.append(created_ms); white_elos.append(white_elo_int); black_elos.append(black_elo_int); player_elos.append(player_elo_int); opp_elos.append(opp_elo_int); ply_counts.append(ply); res_nums.append(res_num)
+                events.append(perf); whites.append(white_name); blacks.append(black_name); results.append(_RESULT_MAP.get(winner,"1/2-1/2"))
+                ecos.append(eco); op_names_api.append(op_name_api); op_names_custom.append(op_name_custom); time_controls.append(tc_str); terminations.append(term); game_ids.append(game_id)
+                player_colors.append(player_color); opp_names_raw.append(opp_name_raw); opp_titles.append(opp_title_final)
+                res_strs.append(res_str); variants.append(variant); speeds.append(speed); statuses.append(status); perf_types.append(perf)
+            except orjson.JSONDecodeError: error_counter += 1
+            except Exception: error_counter += 1
+    if not dates_ms: return pd.DataFrame(), error_counter
+    created_ms_arr = np.frombuffer(dates_ms, dtype=np.int64); valid_dates = created_ms_arr != -1
+    # Build the frame in one shot from the column buffers; copy=False lets the numeric columns borrow the array.array memory
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(created_ms_arr, unit='ms', utc=True).where(valid_dates), 'Event': events, 'White': pd.array(whites, dtype=ARROW_STRING), 'Black': pd.array(blacks, dtype=ARROW_STRING), 'Result': results,
+        'WhiteElo': np.frombuffer(white_elos, dtype=np.int16), 'BlackElo': np.frombuffer(black_elos, dtype=np.int16), 'ECO': ecos,
+        'OpeningName_API': op_names_api, 'OpeningName_Custom': op_names_custom, 'TimeControl': time_controls, 'Termination': terminations,
+        'PlyCount': np.frombuffer(ply_counts, dtype=np.int16), 'LichessID': pd.array(game_ids, dtype=ARROW_STRING), 'PlayerID': username, 'PlayerColor': player_colors,
+        'PlayerElo': np.frombuffer(player_elos, dtype=np.int16), 'OpponentNameRaw': pd.array(opp_names_raw, dtype=ARROW_STRING),
+        'OpponentElo': np.frombuffer(opp_elos, dtype=np.int16), 'OpponentTitle': opp_titles, 'PlayerResultNumeric': np.frombuffer(res_nums, dtype=np.float32),
+        'PlayerResultString': res_strs, 'Variant': variants, 'Speed': speeds, 'Status': statuses, 'PerfType': perf_types,
+    }, copy=False)
+    if not valid_dates.all(): df = df[valid_dates] # single mask instead of a per-game NaT check
+    if df.empty: return pd.DataFrame(), error_counter
+    for col, values in calendar_fields_from_ms(created_ms_arr[valid_dates]).items(): df[col] = values
+    df['EloDiff'] = df['PlayerElo'] - df['OpponentElo']
+    df['_is_win'] = df['PlayerResultNumeric'].eq(1).astype('uint8') # Summed for win counts so groupbys stay on the Cython path (no lambdas)
+    df['TimeControl_Category'] = categorize_time_control_series(df['TimeControl'], df['Speed'])
+    for col in CATEGORICAL_COLUMNS: df[col] = df[col].astype('category')
+    # No rename needed ('OpeningName_API', 'OpeningName_Custom' exist)
+    df = df.sort_values(by='Date').reset_index(drop=True)
+    df.attrs['analysis_key'] = analysis_key(username, time_period_key, perf_type, rated) # Inherited by filtered subsets; part of the plot cache key
+    return df, error_counter
+
+def _fetch_from_lichess_api(username: str, time_period_key: str, perf_type: str, rated: bool, eco_map):
+    """ Foreground loader: runs _fetch_games and reports progress / problems in the UI. """
+    st.info(f"Fetching games for '{username}' ({time_period_key} | Type: {perf_type})...")
+    start_date = fetch_start_date(time_period_key)
+    if start_date: st.caption(f"Fetching since: {start_date.strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    else: st.warning("Invalid time period.") # Should not be reached
     try:
-        with st.spinner(f"Calling Lichess API for {username} ({perf_type} games)..."):
-            response = requests.get(api_url, params=api_params, headers=headers, stream=True); response.raise_for_status()
-            for line in response.iter_lines():
-                if line:
-                    game_data_raw = line.decode('utf-8'); game_data = None
-                    try:
-                        game_data = json.loads(game_data_raw)
-                        white_info=game_data.get('players',{}).get('white',{}); black_info=game_data.get('players',{}).get('black',{})
-                        white_user=white_info.get('user',{}); black_user=black_info.get('user',{})
-                        opening_info=game_data.get('opening',{}); clock_info=game_data.get('clock')
-                        game_id=game_data.get('id','N/A'); created_at_ms=game_data.get('createdAt')
-                        game_date=pd.to_datetime(created_at_ms,unit='ms',utc=True,errors='coerce');
-                        if pd.isna(game_date): continue
-                        variant=game_data.get('variant','standard'); speed=game_data.get('speed','unknown')
-                        perf=game_data.get('perf','unknown'); status=game_data.get('status','unknown'); winner=game_data.get('winner')
-                        white_name=white_user.get('name','Unknown'); black_name=black_user.get('name','Unknown')
-                        white_title=white_user.get('title'); black_title=black_user.get('title')
-                        white_rating=pd.to_numeric(white_info.get('rating'),errors='coerce')
-                        black_rating=pd.to_numeric(black_info.get('rating'),errors='coerce')
-                        player_color,player_elo,opp_name_raw,opp_title_raw,opp_elo=(None,None,'Unknown',None,None)
-                        if username_lower==white_name.lower(): player_color,player_elo,opp_name_raw,opp_title_raw,opp_elo=('White',white_rating,black_name,black_title,black_rating)
-                        elif username_lower==black_name.lower(): player_color,player_elo,opp_name_raw,opp_title_raw,opp_elo=('Black',black_rating,white_name,white_title,white_rating)
-                        else: continue
-                        if player_color is None or pd.isna(player_elo) or pd.isna(opp_elo): continue
-                        res_num,res_str=(0.5,"Draw")
-                        if status not in ['draw','stalemate']:
-                           if winner==player_color.lower(): res_num,res_str=(1,"Win")
-                           elif winner is not None: res_num,res_str=(0,"Loss")
-                        tc_str="Unknown"
-                        if clock_info: init=clock_info.get('initial');incr=clock_info.get('increment');
-                        if init is not None and incr is not None: tc_str=f"{init}+{incr}"
-                        elif speed=='correspondence': tc_str="Correspondence"
-                        eco=opening_info.get('eco','Unknown'); op_name_api=opening_info.get('name','Unknown Opening').replace('?','').split(':')[0].strip()
-                        op_name_custom=eco_map.get(eco, f"ECO: {eco}" if eco!='Unknown' else 'Unknown Opening') # Use loaded map
-                        term_map={"mate":"Normal","resign":"Normal","stalemate":"Normal","timeout":"Time forfeit","draw":"Normal","outoftime":"Time forfeit","cheat":"Cheat","noStart":"Aborted","unknownFinish":"Unknown","variantEnd":"Variant End"}
-                        term=term_map.get(status,"Unknown")
-                        opp_title_final='Unknown'
-                        if opp_title_raw and opp_title_raw.strip(): opp_title_clean=opp_title_raw.replace(' ','').strip().upper();
-                        if opp_title_clean and opp_title_clean!='?': opp_title_final=opp_title_clean
-                        def clean_name(n): return re.sub(r'^(GM|IM|FM|WGM|WIM|WFM|CM|WCM|NM)\s+','',n).strip()
-                        opp_name_clean=clean_name(opp_name_raw)
-                        all_games_data.append({'Date':game_date,'Event':perf,'White':white_name,'Black':black_name,'Result':"1-0" if winner=='white' else ("0-1" if winner=='black' else "1/2-1/2"),'WhiteElo':int(white_rating) if not pd.isna(white_rating) else 0,'BlackElo':int(black_rating) if not pd.isna(black_rating) else 0,'ECO':eco,'OpeningName_API':op_name_api,'OpeningName_Custom':op_name_custom,'TimeControl':tc_str,'Termination':term,'PlyCount':game_data.get('turns',0),'LichessID':game_id,'PlayerID':username,'PlayerColor':player_color,'PlayerElo':int(player_elo),'OpponentName':opp_name_clean,'OpponentNameRaw':opp_name_raw,'OpponentElo':int(opp_elo),'OpponentTitle':opp_title_final,'PlayerResultNumeric':res_num,'PlayerResultString':res_str,'Variant':variant,'Speed':speed,'Status':status,'PerfType':perf})
-                    except json.JSONDecodeError: error_counter += 1
-                    except Exception: error_counter += 1
+        with st.spinner(f"Calling Lichess API for {username} ({perf_type} games)..."): df, error_counter = _fetch_games(username, time_period_key, perf_type, rated, eco_map)
     except requests.exceptions.RequestException as e: st.error(f"🚨 API Request Failed: {e}"); return pd.DataFrame()
     except Exception as e: st.error(f"🚨 Unexpected error: {e}"); st.text(traceback.format_exc()); return pd.DataFrame()
     if error_counter > 0: st.warning(f"Skipped {error_counter} entries due to processing errors.")
-    if not all_games_data: st.warning(f"No games found for '{username}' matching criteria."); return pd.DataFrame()
-    df = pd.DataFrame(all_games_data); st.success(f"Processed {len(df)} games.")
-    if not df.empty:
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce'); df = df.dropna(subset=['Date'])
-        if df.empty: return df
-        df['Year'] = df['Date'].dt.year; df['Month'] = df['Date'].dt.month; df['Day'] = df['Date'].dt.day
-        df['Hour'] = df['Date'].dt.hour; df['DayOfWeekNum'] = df['Date'].dt.dayofweek; df['DayOfWeekName'] = df['Date'].dt.day_name()
-        df['PlayerElo'] = df['PlayerElo'].astype(int); df['OpponentElo'] = df['OpponentElo'].astype(int)
-        df['EloDiff'] = df['PlayerElo'] - df['OpponentElo']
-        df['TimeControl_Category'] = df.apply(lambda row: categorize_time_control(row['TimeControl'], row['Speed']), axis=1)
-        # No rename needed ('OpeningName_API', 'OpeningName_Custom' exist)
-        df = df.sort_values(by='Date').reset_index(drop=True)
+    if df.empty: st.warning(f"No games found for '{username}' matching criteria."); return df
+    st.success(f"Processed {len(df)} games."); return df
+
+# =============================================
+# On-Disk Parquet Cache (second tier below st.cache_data)
+# =============================================
+@st.cache_resource(show_spinner=False)
+def _disk_cache_refresh_state():
+    """Paths currently being refreshed + their lock. Cached as a resource because Streamlit re-executes module globals on every rerun."""
+    return set(), threading.Lock()
+
+def _disk_cache_path(username, time_period_key, perf_type, rated):
+    key = hashlib.sha1(f"v{DISK_CACHE_VERSION}|{analysis_key(username, time_period_key, perf_type, rated)}".encode('utf-8')).hexdigest()
+    return os.path.join(DISK_CACHE_DIR, f"{key}.parquet")
+
+def _write_disk_cache(path, df):
+    """Writes to a temp file first so a concurrent reader never sees a half-written parquet."""
+    try:
+        os.makedirs(DISK_CACHE_DIR, exist_ok=True); tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path, compression='zstd'); os.replace(tmp_path, path)
+    except Exception: pass # Best-effort: read-only FS, missing pyarrow, etc. just means no disk cache
+    _prune_disk_cache()
+
+def _prune_disk_cache():
+    """Deletes entries too old to ever be served (and leftover temp files, old cache versions), so cache/ doesn't grow without bound."""
+    cutoff = time.time() - DISK_CACHE_MAX_STALE
+    try:
+        with os.scandir(DISK_CACHE_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff: os.remove(entry.path)
+                except OSError: pass # Removed concurrently, permissions, ...
+    except OSError: pass
+
+def _refresh_disk_cache(path, username, time_period_key, perf_type, rated, eco_map):
+    try:
+        df, _ = _fetch_games(username, time_period_key, perf_type, rated, eco_map) # UI-free core: no session to report to on this thread
+        if not df.empty: _write_disk_cache(path, df)
+    except Exception: pass
+    finally:
+        refreshing_paths, refresh_lock = _disk_cache_refresh_state()
+        with refresh_lock: refreshing_paths.discard(path)
+
+@st.cache_data(ttl=3600)
+def load_from_lichess_api(username: str, time_period_key: str, perf_type: str, rated: bool, _eco_map):
+    """ Fetches and processes Lichess games, served from the on-disk parquet cache when available (stale-while-revalidate).
+    _eco_map is the static ECO mapping; the leading underscore keeps st.cache_data from hashing it. """
+    if not username: st.warning("Please enter a Lichess username."); return pd.DataFrame()
+    if not perf_type: st.warning("Please select a game type."); return pd.DataFrame()
+    path = _disk_cache_path(username, time_period_key, perf_type, rated)
+    try: age = time.time() - os.path.getmtime(path)
+    except OSError: age = None
+    if age is not None and age < DISK_CACHE_MAX_STALE:
+        try: df = pd.read_parquet(path)
+        except Exception: df = None # Unreadable entry: fall through to the API
+        if df is not None:
+            if age >= DISK_CACHE_TTL: # Stale: serve it now, refresh in the background for the next load
+                refreshing_paths, refresh_lock = _disk_cache_refresh_state()
+                with refresh_lock: start_refresh = path not in refreshing_paths; refreshing_paths.add(path)
+                if start_refresh: threading.Thread(target=_refresh_disk_cache, args=(path, username, time_period_key, perf_type, rated, _eco_map), daemon=True).start()
+            st.success(f"Loaded {len(df)} games from local cache."); return df
+    df = _fetch_from_lichess_api(username, time_period_key, perf_type, rated, _eco_map)
+    if not df.empty: _write_disk_cache(path, df)
     return df
 
 # =============================================
-# Plotting Functions (Unchanged from v12)
+# Cached Summaries & Plotting Functions
 # =============================================
-# (Insert ALL plotting functions here - plot_win_loss_pie, ..., plot_most_frequent_opponents, including time forfeit plots)
-# ... (Code identical to previous version v12) ...
-def plot_win_loss_pie(df, display_name):
-    if 'PlayerResultString' not in df.columns: return go.Figure()
-    result_counts = df['PlayerResultString'].value_counts()
+# Plotters take small precomputed tables (counts, per-axis aggregates) where one is shared; all of it is cached per frame
+def _df_fingerprint(d):
+    """Cheap cache key for a games frame: the analysis it came from (user/period/perf) plus row count, Date span and Elo sum,
+    which change whenever the filtered set changes. Small summary tables (no Date column) are hashed by content instead."""
+    if 'Date' not in d.columns: return (tuple(d.columns), pd.util.hash_pandas_object(d).to_numpy().tobytes())
+    if d.empty: return (0, tuple(d.columns))
+    return (d.attrs.get('analysis_key'), len(d), d['Date'].iat[0].value, d['Date'].iat[-1].value, int(d['PlayerElo'].sum()) if 'PlayerElo' in d.columns else 0)
+
+# Summary tables and figures are cached across reruns; frames are keyed by _df_fingerprint instead of hashing every cell
+_frame_cache = st.cache_data(show_spinner=False, ttl=600, hash_funcs={pd.DataFrame: _df_fingerprint})
+# Filtered subsets are shared as-is (no pickle round-trip of whole frames); callers must treat them as read-only
+_subset_cache = st.cache_resource(show_spinner=False, ttl=600, max_entries=64, hash_funcs={pd.DataFrame: _df_fingerprint})
+
+@_frame_cache
+def opponent_names(df):
+    """Title-stripped opponent names as a categorical Series (one vectorized str.replace, cached per frame). Only the opponent /
+    titled / time-forfeit views need them, so the loader keeps just 'OpponentNameRaw' and the session's frame is never mutated."""
+    if 'OpponentName' in df.columns: return df['OpponentName'] # Subsets from the filters below already carry it
+    return df['OpponentNameRaw'].str.replace(_TITLE_RE, '', regex=True).str.strip().astype('category').rename('OpponentName') # Repeat opponents: count on codes
+
+@_frame_cache
+def opponent_counts(df):
+    """Games per opponent (without 'Unknown'), most frequent first; computed once, sliders only take .head(n)."""
+    vc = opponent_names(df).value_counts()
+    return vc[vc > 0].drop(labels=['Unknown'], errors='ignore')
+
+
+@_frame_cache
+def time_axis_aggregates(df):
+    """Games and wins per day-of-week / hour / day-of-month / year, computed once and shared by the eight time-axis plots.
+    The keys are small integers (category codes or offset calendar fields), so each axis is two np.bincount passes, no groupby/hash."""
+    is_win = df['_is_win'].to_numpy(); aggs = {}
+    for axis, col in TIME_AXES.items():
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype): keys, labels = s.cat.codes.to_numpy(), s.cat.categories
+        else: v = s.to_numpy(); lo = int(v.min()) if len(v) else 0; keys = v - lo; labels = pd.RangeIndex(lo, lo + int(keys.max(initial=-1)) + 1)
+        games = np.bincount(keys, minlength=len(labels)); wins = np.bincount(keys, weights=is_win, minlength=len(labels)).astype(np.int64)
+        t = pd.DataFrame({'games': games, 'wins': wins}, index=pd.Index(labels, name=col)); aggs[axis] = t[t['games'] > 0] # observed keys only
+    return aggs
+
+@_frame_cache
+def result_summaries(df):
+    """Result counts overall and per color, computed once per frame and shared by the pie and color plots (Overview / Color / Titled)."""
+    if not all(col in df.columns for col in ['PlayerColor', 'PlayerResultString']): return {'results': pd.Series(dtype='int64'), 'by_color': pd.DataFrame()}
+    result_counts = df['PlayerResultString'].value_counts(); result_counts = result_counts[result_counts > 0] # drop unobserved categories
+    return {'results': result_counts, 'by_color': df.groupby(['PlayerColor','PlayerResultString'], observed=True).size().unstack(fill_value=0)}
+@_frame_cache
+def plot_win_loss_pie(result_counts, display_name):
+    if result_counts.empty: return go.Figure()
     fig = px.pie(values=result_counts.values, names=result_counts.index, title=f'Overall Results for {display_name}', color=result_counts.index, color_discrete_map={'Win':'#4CAF50', 'Draw':'#B0BEC5', 'Loss':'#F44336'}, hole=0.3)
     fig.update_traces(textposition='inside', textinfo='percent+label', pull=[0.05 if x == 'Win' else 0 for x in result_counts.index]); fig.update_layout(dragmode=False); return fig
-def plot_win_loss_by_color(df):
-    if not all(col in df.columns for col in ['PlayerColor', 'PlayerResultString']): return go.Figure()
-    try: color_results=df.groupby(['PlayerColor','PlayerResultString']).size().unstack(fill_value=0)
-    except KeyError: return go.Figure().update_layout(title="Error: Missing Columns")
-    for res in ['Win','Draw','Loss']: color_results[res]=color_results.get(res,0)
-    color_results=color_results[['Win','Draw','Loss']]; total=color_results.sum(axis=1); color_results_pct=color_results.apply(lambda x:x*100/total[x.name] if total[x.name]>0 else 0,axis=1)
+@_frame_cache
+def plot_win_loss_by_color(by_color):
+    if by_color.empty: return go.Figure()
+    color_results=by_color.reindex(columns=['Win','Draw','Loss'], fill_value=0); total=color_results.sum(axis=1); color_results_pct=color_results.apply(lambda x:x*100/total[x.name] if total[x.name]>0 else 0,axis=1)
     fig=px.bar(color_results_pct, barmode='stack', title='Results by Color', labels={'value':'%', 'PlayerColor':'Played As'}, color='PlayerResultString', color_discrete_map={'Win':'#4CAF50', 'Draw':'#B0BEC5', 'Loss':'#F44336'}, text_auto='.1f', category_orders={"PlayerColor":["White","Black"]})
     fig.update_layout(yaxis_title="Percentage (%)", xaxis_title="Color Played", dragmode=False); fig.update_traces(textangle=0); return fig
+@_frame_cache
 def plot_rating_trend(df, display_name):
     if not all(col in df.columns for col in ['Date', 'PlayerElo']): return go.Figure()
-    df_plot=df.copy(); df_plot['PlayerElo']=pd.to_numeric(df_plot['PlayerElo'],errors='coerce'); df_sorted=df_plot[df_plot['PlayerElo'].notna() & (df_plot['PlayerElo']>0)].sort_values('Date')
+    elo=pd.to_numeric(df['PlayerElo'],errors='coerce'); df_sorted=df.loc[elo.notna() & (elo>0), ['Date']].assign(PlayerElo=elo).sort_values('Date') # Thin 2-column projection, no full-frame copy
     if df_sorted.empty: return go.Figure().update_layout(title=f"No Elo data")
     fig=go.Figure(); fig.add_trace(go.Scatter(x=df_sorted['Date'], y=df_sorted['PlayerElo'], mode='lines+markers', name='Elo', line=dict(color='#1E88E5',width=2), marker=dict(size=5,opacity=0.7)))
     fig.update_layout(title=f'{display_name}\'s Rating Trend', xaxis_title='Date', yaxis_title='Elo Rating', hovermode="x unified", xaxis_rangeslider_visible=True, dragmode=False); return fig
+@_frame_cache
 def plot_performance_vs_opponent_elo(df):
     if not all(col in df.columns for col in ['PlayerResultString', 'EloDiff']): return go.Figure()
     fig=px.box(df, x='PlayerResultString', y='EloDiff', title='Elo Advantage vs. Result', labels={'PlayerResultString':'Result', 'EloDiff':'Your Elo - Opponent Elo'}, category_orders={"PlayerResultString":["Win","Draw","Loss"]}, color='PlayerResultString', color_discrete_map={'Win':'#4CAF50','Draw':'#B0BEC5','Loss':'#F44336'}, points='outliers')
     fig.add_hline(y=0, line_dash="dash", line_color="grey"); fig.update_traces(marker=dict(opacity=0.8)); fig.update_layout(dragmode=False); return fig
-def plot_games_by_dow(df):
-    if 'DayOfWeekName' not in df.columns: return go.Figure()
-    dow_order=["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
-    games_by_dow=df['DayOfWeekName'].value_counts().reindex(dow_order, fill_value=0)
+@_frame_cache
+def plot_games_by_dow(dow_agg):
+    if dow_agg.empty: return go.Figure()
+    games_by_dow=dow_agg['games'].reindex(DAY_NAMES, fill_value=0)
     fig=px.bar(games_by_dow, x=games_by_dow.index, y=games_by_dow.values, title="Games by Day of Week", labels={'x':'Day','y':'Games'}, text=games_by_dow.values)
     fig.update_traces(marker_color='#9C27B0', textposition='outside'); fig.update_layout(dragmode=False); return fig
-def plot_winrate_by_dow(df):
-    if not all(col in df.columns for col in ['DayOfWeekName', 'PlayerResultNumeric']): return go.Figure()
-    dow_order=["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
-    wins_by_dow=df[df['PlayerResultNumeric']==1].groupby('DayOfWeekName').size(); total_by_dow=df.groupby('DayOfWeekName').size()
-    win_rate=(wins_by_dow.reindex(total_by_dow.index,fill_value=0)/total_by_dow).fillna(0)*100
-    win_rate=win_rate.reindex(dow_order,fill_value=0)
+@_frame_cache
+def plot_winrate_by_dow(dow_agg):
+    if dow_agg.empty: return go.Figure()
+    win_rate=(dow_agg['wins']/dow_agg['games']).fillna(0)*100
+    win_rate=win_rate.reindex(DAY_NAMES,fill_value=0)
     fig=px.bar(win_rate, x=win_rate.index, y=win_rate.values, title="Win Rate (%) by Day", labels={'x':'Day','y':'Win Rate (%)'}, text=win_rate.values)
     fig.update_traces(marker_color='#FF9800', texttemplate='%{text:.1f}%', textposition='outside'); fig.update_layout(yaxis_range=[0,100], dragmode=False); return fig
-def plot_games_by_hour(df):
-    if 'Hour' not in df.columns: return go.Figure()
-    games_by_hour=df['Hour'].value_counts().sort_index().reindex(range(24),fill_value=0)
+@_frame_cache
+def plot_games_by_hour(hour_agg):
+    if hour_agg.empty: return go.Figure()
+    games_by_hour=hour_agg['games'].reindex(range(24),fill_value=0)
     fig=px.bar(games_by_hour, x=games_by_hour.index, y=games_by_hour.values, title="Games by Hour (UTC)", labels={'x':'Hour','y':'Games'}, text=games_by_hour.values)
     fig.update_traces(marker_color='#03A9F4', textposition='outside'); fig.update_layout(xaxis=dict(tickmode='linear'), dragmode=False); return fig
-def plot_winrate_by_hour(df):
-    if not all(col in df.columns for col in ['Hour', 'PlayerResultNumeric']): return go.Figure()
-    wins_by_hour=df[df['PlayerResultNumeric']==1].groupby('Hour').size(); total_by_hour=df.groupby('Hour').size()
-    win_rate=(wins_by_hour.reindex(total_by_hour.index,fill_value=0)/total_by_hour).fillna(0)*100
+@_frame_cache
+def plot_winrate_by_hour(hour_agg):
+    if hour_agg.empty: return go.Figure()
+    win_rate=(hour_agg['wins']/hour_agg['games']).fillna(0)*100
     win_rate=win_rate.reindex(range(24),fill_value=0)
     fig=px.line(win_rate, x=win_rate.index, y=win_rate.values, markers=True, title="Win Rate (%) by Hour (UTC)", labels={'x':'Hour','y':'Win Rate (%)'})
     fig.update_traces(line_color='#8BC34A'); fig.update_layout(yaxis_range=[0,100], xaxis=dict(tickmode='linear'), dragmode=False); return fig
-def plot_games_by_dom(df):
-    if 'Day' not in df.columns: return go.Figure()
-    games_by_dom = df['Day'].value_counts().sort_index().reindex(range(1, 32), fill_value=0)
+@_frame_cache
+def plot_games_by_dom(dom_agg):
+    if dom_agg.empty: return go.Figure()
+    games_by_dom = dom_agg['games'].reindex(range(1, 32), fill_value=0)
     fig = px.bar(games_by_dom, x=games_by_dom.index, y=games_by_dom.values, title="Games Played per Day of Month", labels={'x': 'Day of Month', 'y': 'Number of Games'}, text=games_by_dom.values)
     fig.update_traces(marker_color='#E91E63', textposition='outside'); fig.update_layout(xaxis=dict(tickmode='linear'), dragmode=False); return fig
-def plot_winrate_by_dom(df):
-    if not all(col in df.columns for col in ['Day', 'PlayerResultNumeric']): return go.Figure()
-    wins_by_dom=df[df['PlayerResultNumeric']==1].groupby('Day').size(); total_by_dom=df.groupby('Day').size()
-    win_rate=(wins_by_dom.reindex(total_by_dom.index,fill_value=0)/total_by_dom).fillna(0)*100
+@_frame_cache
+def plot_winrate_by_dom(dom_agg):
+    if dom_agg.empty: return go.Figure()
+    win_rate=(dom_agg['wins']/dom_agg['games']).fillna(0)*100
     win_rate=win_rate.reindex(range(1,32),fill_value=0)
     fig=px.line(win_rate, x=win_rate.index, y=win_rate.values, markers=True, title="Win Rate (%) per Day of Month", labels={'x': 'Day of Month', 'y': 'Win Rate (%)'})
     fig.update_traces(line_color='#FF5722'); fig.update_layout(yaxis_range=[0,100], xaxis=dict(tickmode='linear'), dragmode=False); return fig
-def plot_games_per_year(df):
-    if 'Year' not in df.columns: return go.Figure()
-    games_per_year = df['Year'].value_counts().sort_index()
+@_frame_cache
+def plot_games_per_year(year_agg):
+    if year_agg.empty: return go.Figure()
+    games_per_year = year_agg['games']
     fig = px.bar(games_per_year, x=games_per_year.index, y=games_per_year.values, title='Games Per Year', labels={'x':'Year','y':'Games'}, text=games_per_year.values)
     fig.update_traces(marker_color='#2196F3', textposition='outside'); fig.update_layout(xaxis_title="Year", yaxis_title="Number of Games", xaxis={'type':'category'}, dragmode=False); return fig
-def plot_win_rate_per_year(df):
-    if not all(col in df.columns for col in ['Year', 'PlayerResultNumeric']): return go.Figure()
-    wins_per_year=df[df['PlayerResultNumeric']==1].groupby('Year').size(); total_per_year=df.groupby('Year').size()
-    win_rate=(wins_per_year.reindex(total_per_year.index,fill_value=0)/total_per_year).fillna(0)*100
+@_frame_cache
+def plot_win_rate_per_year(year_agg):
+    if year_agg.empty: return go.Figure()
+    win_rate=(year_agg['wins']/year_agg['games']).fillna(0)*100
     win_rate.index=win_rate.index.astype(str)
     fig=px.line(win_rate, x=win_rate.index, y=win_rate.values, title='Win Rate (%) Per Year', markers=True, labels={'x':'Year','y':'Win Rate (%)'})
     fig.update_traces(line_color='#FFC107', line_width=2.5); fig.update_layout(yaxis_range=[0,100], dragmode=False); return fig
+@_frame_cache
 def plot_performance_by_time_control(df):
      if not all(col in df.columns for col in ['TimeControl_Category', 'PlayerResultString']): return go.Figure()
      try:
-        tc_results=df.groupby(['TimeControl_Category','PlayerResultString']).size().unstack(fill_value=0)
+        tc_results=df.groupby(['TimeControl_Category','PlayerResultString'], observed=True).size().unstack(fill_value=0)
         for res in ['Win','Draw','Loss']: tc_results[res]=tc_results.get(res,0)
         tc_results=tc_results[['Win','Draw','Loss']]; total=tc_results.sum(axis=1)
         tc_results_pct=tc_results.apply(lambda x:x*100/total[x.name] if total[x.name]>0 else 0, axis=1)
@@ -259,53 +493,197 @@ def plot_performance_by_time_control(df):
         fig=px.bar(tc_results_pct, title='Performance by Time Control', labels={'value':'%','TimeControl_Category':'Category'}, color='PlayerResultString', color_discrete_map={'Win':'#4CAF50','Draw':'#B0BEC5','Loss':'#F44336'}, barmode='group', text_auto='.1f')
         fig.update_layout(xaxis_title="Time Control Category", yaxis_title="Percentage (%)", dragmode=False); fig.update_traces(textangle=0); return fig
      except Exception: return go.Figure().update_layout(title="Error")
-def plot_opening_frequency(df, top_n=20, opening_col='OpeningName_API'):
-    if opening_col not in df.columns: return go.Figure()
+@_frame_cache
+def opening_counts(df, opening_col):
+    """Games per opening (without 'Unknown Opening'), most frequent first; computed once per column, the sliders only take .head(n)."""
+    vc = df[opening_col].value_counts()
+    return vc[vc > 0].drop(labels=['Unknown Opening'], errors='ignore')
+@_frame_cache
+def opening_win_stats(df, opening_col):
+    """Games / wins / win rate per opening (without 'Unknown Opening'); the min-games and top-N sliders only filter this table."""
+    opening_stats = df.groupby(opening_col, observed=True).agg(total_games=('PlayerResultNumeric','count'), wins=('_is_win','sum'))
+    opening_stats = opening_stats[opening_stats.index!='Unknown Opening'].copy()
+    opening_stats['win_rate']=(opening_stats['wins']/opening_stats['total_games'])*100; return opening_stats
+@_frame_cache
+def plot_opening_frequency(opening_counts_top, top_n=20, opening_col='OpeningName_API'):
+    """Takes the already-sliced opening_counts(...).head(top_n): a slider drag hashes and plots a <=50-row series, never the games."""
     source_label = "Lichess API" if opening_col == 'OpeningName_API' else "Custom Mapping"
-    opening_counts = df[df[opening_col] != 'Unknown Opening'][opening_col].value_counts().nlargest(top_n)
-    fig = px.bar(opening_counts, y=opening_counts.index, x=opening_counts.values, orientation='h', title=f'Top {top_n} Openings ({source_label})', labels={'y':'Opening','x':'Games'}, text=opening_counts.values)
+    fig = px.bar(opening_counts_top, y=opening_counts_top.index, x=opening_counts_top.values, orientation='h', title=f'Top {top_n} Openings ({source_label})', labels={'y':'Opening','x':'Games'}, text=opening_counts_top.values)
     fig.update_layout(yaxis={'categoryorder':'total ascending'}, dragmode=False); fig.update_traces(marker_color='#673AB7', textposition='outside'); return fig
-def plot_win_rate_by_opening(df, min_games=5, top_n=20, opening_col='OpeningName_API'):
-    if not all(col in df.columns for col in [opening_col, 'PlayerResultNumeric']): return go.Figure()
+@_frame_cache
+def plot_win_rate_by_opening(opening_stats, min_games=5, top_n=20, opening_col='OpeningName_API'):
+    """Takes the per-opening table from opening_win_stats; the sliders only filter / rank it."""
     source_label = "Lichess API" if opening_col == 'OpeningName_API' else "Custom Mapping"
-    opening_stats = df.groupby(opening_col).agg(total_games=('PlayerResultNumeric','count'), wins=('PlayerResultNumeric',lambda x:(x==1).sum()))
-    opening_stats = opening_stats[(opening_stats['total_games']>=min_games)&(opening_stats.index!='Unknown Opening')].copy()
+    opening_stats = opening_stats[opening_stats['total_games']>=min_games]
     if opening_stats.empty: return go.Figure().update_layout(title=f"No openings >= {min_games} games ({source_label})")
-    opening_stats['win_rate']=(opening_stats['wins']/opening_stats['total_games'])*100
     opening_stats_plot=opening_stats.nlargest(top_n, 'win_rate')
     fig=px.bar(opening_stats_plot, y=opening_stats_plot.index, x='win_rate', orientation='h', title=f'Top {top_n} Openings by Win Rate (Min {min_games} games, {source_label})', labels={'win_rate':'Win Rate (%)',opening_col:'Opening'}, text='win_rate')
     fig.update_traces(texttemplate='%{text:.1f}%', textposition='inside', marker_color='#009688'); fig.update_layout(yaxis={'categoryorder':'total ascending'}, xaxis_title="Win Rate (%)", dragmode=False); return fig
+@_frame_cache
 def plot_most_frequent_opponents(df, top_n=20):
-    if 'OpponentName' not in df.columns: return go.Figure()
-    opp_counts=df[df['OpponentName']!='Unknown']['OpponentName'].value_counts().nlargest(top_n)
+    if 'OpponentName' not in df.columns and 'OpponentNameRaw' not in df.columns: return go.Figure()
+    opp_counts=opponent_counts(df).nlargest(top_n)
     fig=px.bar(opp_counts, y=opp_counts.index, x=opp_counts.values, orientation='h', title=f'Top {top_n} Opponents', labels={'y':'Opponent','x':'Games'}, text=opp_counts.values)
     fig.update_layout(yaxis={'categoryorder':'total ascending'}, dragmode=False); fig.update_traces(marker_color='#FF5722', textposition='outside'); return fig
+@_frame_cache
 def plot_time_forfeit_summary(wins_tf, losses_tf):
     data={'Outcome':['Won on Time','Lost on Time'],'Count':[wins_tf,losses_tf]}
     df_tf=pd.DataFrame(data)
     fig=px.bar(df_tf,x='Outcome',y='Count',title="Time Forfeit Summary", color='Outcome', color_discrete_map={'Won on Time':'#4CAF50','Lost on Time':'#F44336'}, text='Count')
     fig.update_layout(showlegend=False, dragmode=False); fig.update_traces(textposition='outside'); return fig
+@_frame_cache
 def plot_time_forfeit_by_tc(tf_games_df):
     if 'TimeControl_Category' not in tf_games_df.columns or tf_games_df.empty: return go.Figure().update_layout(title="No TF Data by Category")
-    tf_by_tc=tf_games_df['TimeControl_Category'].value_counts()
+    tf_by_tc=tf_games_df['TimeControl_Category'].value_counts(); tf_by_tc=tf_by_tc[tf_by_tc > 0]
     fig=px.bar(tf_by_tc,x=tf_by_tc.index,y=tf_by_tc.values, title="Time Forfeits by Time Control", labels={'x':'Category','y':'Forfeits'}, text=tf_by_tc.values)
     fig.update_layout(dragmode=False); fig.update_traces(marker_color='#795548', textposition='outside'); return fig
 
+@_frame_cache
+def plot_termination_reasons(df):
+    if 'Termination' not in df.columns: return go.Figure()
+    term_counts=df['Termination'].value_counts(); term_counts=term_counts[term_counts > 0]
+    reasons=term_counts.index.to_numpy(dtype=object); counts=term_counts.to_numpy() # Plain arrays skip px's pandas introspection
+    fig=px.bar(x=reasons, y=counts, title="Game Termination Reasons", labels={'x':'Reason','y':'Count'}, text=counts)
+    fig.update_layout(dragmode=False); fig.update_traces(textposition='outside'); return fig
+
 # =============================================
 # Helper Functions
 # =============================================
-def filter_and_analyze_titled(df, titles):
+@_frame_cache
+def compute_overview_metrics(df):
+    """Every Overview number in one cached call: one bincount over the result column (0 / 0.5 / 1 doubled are the int codes 0 / 1 / 2)
+    and one integer sum over OpponentElo (int column, never NaN, so no NaN-skipping mean is needed)."""
+    codes = (df['PlayerResultNumeric'].to_numpy() * 2).astype(np.int8); total_games = len(df)
+    losses, draws, wins = (int(c) for c in np.bincount(codes, minlength=3)[:3])
+    avg_opp_elo = int(df['OpponentElo'].to_numpy().sum(dtype=np.int64)) / total_games if total_games > 0 else float('nan')
+    return {'total_games': total_games, 'wins': wins, 'losses': losses, 'draws': draws,
+            'win_rate': (wins/total_games*100) if total_games>0 else 0, 'avg_opp_elo': avg_opp_elo}
+
+@_subset_cache
+def filter_and_analyze_titled(df, titles, columns=None):
+    """Games vs the given titles; pass `columns` to get a thin projection (one mask, only the columns the caller plots)."""
     if 'OpponentTitle' not in df.columns: return pd.DataFrame()
-    titled_games = df[df['OpponentTitle'].isin(titles)].copy(); return titled_games
+    mask = df['OpponentTitle'].isin(frozenset(titles))
+    titled_games = df.loc[mask, columns] if columns else df[mask] # Boolean indexing already returns a new frame
+    return titled_games.assign(OpponentName=opponent_names(df)[mask])
 
+@_subset_cache
 def filter_and_analyze_time_forfeits(df):
     if 'Termination' not in df.columns: return pd.DataFrame(), 0, 0
-    tf_games = df[df['Termination'].str.contains("Time forfeit", na=False, case=False)].copy()
+    tf_mask = df['Termination'] == 'Time forfeit' # Exact label from _TERM_MAP; compares category codes, no regex
+    tf_games = df[tf_mask].assign(OpponentName=opponent_names(df)[tf_mask]) # For the recent-forfeits table
     if tf_games.empty: return tf_games, 0, 0
-    wins_tf = len(tf_games[tf_games['PlayerResultNumeric'] == 1])
-    losses_tf = len(tf_games[tf_games['PlayerResultNumeric'] == 0])
+    result_counts = tf_games['PlayerResultNumeric'].value_counts()
+    wins_tf = int(result_counts.get(1, 0)); losses_tf = int(result_counts.get(0, 0))
     return tf_games, wins_tf, losses_tf
 
+# =============================================
+# Section Renderers (fragments: a widget inside one reruns only that section)
+# =============================================
+@st.fragment
+def render_overview(df, display_name):
+    """Overview: results pie + headline metrics."""
+    st.plotly_chart(plot_win_loss_pie(result_summaries(df)['results'], display_name), use_container_width=True)
+    m = compute_overview_metrics(df)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Games", f"{m['total_games']:,}"); col2.metric("Win Rate", f"{m['win_rate']:.1f}%")
+    col3.metric("W|L|D", f"{m['wins']}|{m['losses']}|{m['draws']}"); col4.metric("Avg Opp Elo", f"{m['avg_opp_elo']:.0f}" if not pd.isna(m['avg_opp_elo']) else "N/A")
+
+@st.fragment
+def render_performance_over_time(df, display_name):
+    """Rating trend and per-year games / win rate."""
+    st.plotly_chart(plot_rating_trend(df, display_name), use_container_width=True)
+    time_aggs = time_axis_aggregates(df)
+    st.plotly_chart(plot_games_per_year(time_aggs['year']), use_container_width=True, config=STATIC_CHART_CONFIG)
+    st.plotly_chart(plot_win_rate_per_year(time_aggs['year']), use_container_width=True)
+
+@st.fragment
+def render_performance_by_color(df):
+    """Results split by piece color."""
+    st.plotly_chart(plot_win_loss_by_color(result_summaries(df)['by_color']), use_container_width=True, config=STATIC_CHART_CONFIG)
+
+@st.fragment
+def render_time_and_date(df):
+    """Day-of-week / hour / day-of-month / time-control breakdowns."""
+    time_aggs = time_axis_aggregates(df)
+    st.subheader("Performance by Day of Week")
+    col_dow1, col_dow2 = st.columns(2)
+    with col_dow1: st.plotly_chart(plot_games_by_dow(time_aggs['dow']), use_container_width=True, config=STATIC_CHART_CONFIG)
+    with col_dow2: st.plotly_chart(plot_winrate_by_dow(time_aggs['dow']), use_container_width=True, config=STATIC_CHART_CONFIG)
+    st.subheader("Performance by Hour of Day (UTC)")
+    col_hod1, col_hod2 = st.columns(2)
+    with col_hod1: st.plotly_chart(plot_games_by_hour(time_aggs['hour']), use_container_width=True, config=STATIC_CHART_CONFIG)
+    with col_hod2: st.plotly_chart(plot_winrate_by_hour(time_aggs['hour']), use_container_width=True)
+    st.subheader("Performance by Day of Month")
+    col_dom1, col_dom2 = st.columns(2)
+    with col_dom1: st.plotly_chart(plot_games_by_dom(time_aggs['dom']), use_container_width=True, config=STATIC_CHART_CONFIG)
+    with col_dom2: st.plotly_chart(plot_winrate_by_dom(time_aggs['dom']), use_container_width=True)
+    st.subheader("Performance by Time Control Category")
+    st.plotly_chart(plot_performance_by_time_control(df), use_container_width=True, config=STATIC_CHART_CONFIG)
+
+@st.fragment
+def render_openings(df, eco_map):
+    """Opening frequency and win rate, for both the API names and the custom ECO names."""
+    # Slider values live in session_state (keyed widgets); a drag reruns only this fragment, which slices the cached per-column tables
+    st.subheader("Opening Analysis (Lichess API Names)")
+    n_openings_api = st.slider("Num top openings (API):", 5, 50, 15, key="n_openings_freq_api")
+    st.plotly_chart(plot_opening_frequency(opening_counts(df, 'OpeningName_API').head(n_openings_api), top_n=n_openings_api, opening_col='OpeningName_API'), use_container_width=True, config=STATIC_CHART_CONFIG)
+    min_games_api = st.slider("Min games (API):", 1, 25, 5, key="min_games_perf_api")
+    n_perf_api = st.slider("Num openings by win rate (API):", 5, 50, 15, key="n_openings_perf_api")
+    st.plotly_chart(plot_win_rate_by_opening(opening_win_stats(df, 'OpeningName_API'), min_games=min_games_api, top_n=n_perf_api, opening_col='OpeningName_API'), use_container_width=True, config=STATIC_CHART_CONFIG)
+    st.markdown("---")
+    st.subheader("Opening Analysis (Custom ECO Mapping)")
+    if not eco_map: st.warning("Custom ECO mapping file not loaded.")
+    else:
+         n_openings_cust = st.slider("Num top openings (Custom):", 5, 50, 15, key="n_openings_freq_cust")
+         st.plotly_chart(plot_opening_frequency(opening_counts(df, 'OpeningName_Custom').head(n_openings_cust), top_n=n_openings_cust, opening_col='OpeningName_Custom'), use_container_width=True, config=STATIC_CHART_CONFIG)
+         min_games_cust = st.slider("Min games (Custom):", 1, 25, 5, key="min_games_perf_cust")
+         n_perf_cust = st.slider("Num openings by win rate (Custom):", 5, 50, 15, key="n_openings_perf_cust")
+         st.plotly_chart(plot_win_rate_by_opening(opening_win_stats(df, 'OpeningName_Custom'), min_games=min_games_cust, top_n=n_perf_cust, opening_col='OpeningName_Custom'), use_container_width=True, config=STATIC_CHART_CONFIG)
+
+@st.fragment
+def render_opponents(df):
+    """Most frequent opponents and performance vs opponent Elo."""
+    st.subheader("Frequent Opponents")
+    n_opponents_freq = st.slider("Num top opponents:", 5, 50, 20, key="n_opponents_freq_opp")
+    st.plotly_chart(plot_most_frequent_opponents(df, top_n=n_opponents_freq), use_container_width=True, config=STATIC_CHART_CONFIG)
+    st.markdown(f"#### Top {n_opponents_freq} Opponents List")
+    st.dataframe(opponent_counts(df).head(n_opponents_freq).rename_axis('OpponentName').reset_index(name='Games'))
+    st.subheader("Performance vs Opponent Elo")
+    st.plotly_chart(plot_performance_vs_opponent_elo(df), use_container_width=True)
+
+@st.fragment
+def render_titled(df, display_name):
+    """Games against the selected opponent titles."""
+    st.subheader("Filter by Opponent Title")
+    selected_titles = st.multiselect("Select Opponent Titles:", TITLES_TO_ANALYZE, default=['GM','IM'])
+    if selected_titles:
+        titled_games = filter_and_analyze_titled(df, tuple(sorted(selected_titles)), columns=TITLED_VIEW_COLUMNS) # Order-independent cache key
+        if not titled_games.empty:
+            st.success(f"Found **{len(titled_games):,}** games vs selected titles ({', '.join(selected_titles)}). Analyzing subset...")
+            titled_results = result_summaries(titled_games)
+            st.plotly_chart(plot_win_loss_pie(titled_results['results'], f"{display_name} vs {', '.join(selected_titles)}"), use_container_width=True)
+            st.plotly_chart(plot_win_loss_by_color(titled_results['by_color']), use_container_width=True, config=STATIC_CHART_CONFIG)
+            st.plotly_chart(plot_rating_trend(titled_games, f"{display_name} (vs {', '.join(selected_titles)})"), use_container_width=True)
+            st.plotly_chart(plot_opening_frequency(opening_counts(titled_games, 'OpeningName_API').head(15), top_n=15, opening_col='OpeningName_API'), use_container_width=True, config=STATIC_CHART_CONFIG)
+            st.plotly_chart(plot_most_frequent_opponents(titled_games, top_n=15), use_container_width=True, config=STATIC_CHART_CONFIG)
+        else: st.warning(f"ℹ️ No games found vs selected titles ({', '.join(selected_titles)}).")
+    else: st.info("Select one or more titles to see the analysis.")
+
+@st.fragment
+def render_terminations(df):
+    """Time-forfeit breakdown and overall termination reasons."""
+    st.subheader("Time Forfeit Analysis")
+    tf_games, wins_tf, losses_tf = filter_and_analyze_time_forfeits(df)
+    if not tf_games.empty:
+        st.plotly_chart(plot_time_forfeit_summary(wins_tf, losses_tf), use_container_width=True, config=STATIC_CHART_CONFIG)
+        st.plotly_chart(plot_time_forfeit_by_tc(tf_games), use_container_width=True, config=STATIC_CHART_CONFIG)
+        with st.expander("View Recent Time Forfeit Games"):
+             st.dataframe(tf_games.nlargest(20,'Date')[['Date','OpponentName','PlayerColor','PlayerResultString','TimeControl','PlyCount','Termination']]) # Partial selection; no full sort just to show 20 rows
+    else: st.warning("ℹ️ No games found with 'Time forfeit' termination.")
+    st.subheader("Overall Termination Types")
+    st.plotly_chart(plot_termination_reasons(df), use_container_width=True, config=STATIC_CHART_CONFIG)
+
 # =============================================
 # Streamlit App Layout - v14 (Final Syntax Fix, Updated Structure)
 # =============================================
@@ -356,16 +734,17 @@ if isinstance(st.session_state.analysis_df, pd.DataFrame) and not st.session_sta
 
     # --- Sidebar Navigation ---
     st.sidebar.title("📊 Analysis Sections")
-    analysis_options = [ # Renamed sections slightly for clarity
-        "1. Overview & General Stats",
-        "2. Performance Over Time",
-        "3. Performance by Color",
-        "4. Time & Date Analysis", # Includes Year, DOW, Hour, DOM
-        "5. ECO & Opening Analysis", # Shows both API and Custom
-        "6. Opponent Analysis",
-        "7. Games against Titled Players", # Renamed from GM
-        "8. Termination Analysis"
-    ]
+    section_renderers = { # Renamed sections slightly for clarity; only the selected section's fragment is called
+        "1. Overview & General Stats": lambda: render_overview(df, current_display_name),
+        "2. Performance Over Time": lambda: render_performance_over_time(df, current_display_name),
+        "3. Performance by Color": lambda: render_performance_by_color(df),
+        "4. Time & Date Analysis": lambda: render_time_and_date(df), # Includes Year, DOW, Hour, DOM
+        "5. ECO & Opening Analysis": lambda: render_openings(df, eco_mapping), # Shows both API and Custom
+        "6. Opponent Analysis": lambda: render_opponents(df),
+        "7. Games against Titled Players": lambda: render_titled(df, current_display_name), # Renamed from GM
+        "8. Termination Analysis": lambda: render_terminations(df),
+    }
+    analysis_options = list(section_renderers)
     if 'selected_section' not in st.session_state or st.session_state.selected_section not in analysis_options: st.session_state.selected_section = analysis_options[0]
     selected_section = st.sidebar.selectbox( "Choose section:", analysis_options, index=analysis_options.index(st.session_state.selected_section), key="section_select")
     st.session_state.selected_section = selected_section
@@ -373,94 +752,7 @@ if isinstance(st.session_state.analysis_df, pd.DataFrame) and not st.session_sta
     # --- Display Content Based on Selected Section ---
     st.header(selected_section)
 
-    if selected_section == analysis_options[0]: # Overview
-        st.plotly_chart(plot_win_loss_pie(df, current_display_name), use_container_width=True)
-        total_games=len(df); wins=len(df[df['PlayerResultNumeric']==1]); losses=len(df[df['PlayerResultNumeric']==0]); draws=len(df[df['PlayerResultNumeric']==0.5])
-        win_rate=(wins/total_games*100) if total_games>0 else 0; avg_opp_elo=df['OpponentElo'].mean()
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Total Games", f"{total_games:,}"); col2.metric("Win Rate", f"{win_rate:.1f}%")
-        col3.metric("W|L|D", f"{wins}|{losses}|{draws}"); col4.metric("Avg Opp Elo", f"{avg_opp_elo:.0f}" if not pd.isna(avg_opp_elo) else "N/A")
-
-    elif selected_section == analysis_options[1]: # Perf Over Time
-        st.plotly_chart(plot_rating_trend(df, current_display_name), use_container_width=True)
-        st.plotly_chart(plot_games_per_year(df), use_container_width=True)
-        st.plotly_chart(plot_win_rate_per_year(df), use_container_width=True)
-
-    elif selected_section == analysis_options[2]: # Perf By Color
-         st.plotly_chart(plot_win_loss_by_color(df), use_container_width=True)
-
-    elif selected_section == analysis_options[3]: # Time & Date
-        st.subheader("Performance by Day of Week")
-        col_dow1, col_dow2 = st.columns(2)
-        with col_dow1: st.plotly_chart(plot_games_by_dow(df), use_container_width=True)
-        with col_dow2: st.plotly_chart(plot_winrate_by_dow(df), use_container_width=True)
-        st.subheader("Performance by Hour of Day (UTC)")
-        col_hod1, col_hod2 = st.columns(2)
-        with col_hod1: st.plotly_chart(plot_games_by_hour(df), use_container_width=True)
-        with col_hod2: st.plotly_chart(plot_winrate_by_hour(df), use_container_width=True)
-        st.subheader("Performance by Day of Month")
-        col_dom1, col_dom2 = st.columns(2)
-        with col_dom1: st.plotly_chart(plot_games_by_dom(df), use_container_width=True)
-        with col_dom2: st.plotly_chart(plot_winrate_by_dom(df), use_container_width=True)
-        st.subheader("Performance by Time Control Category")
-        st.plotly_chart(plot_performance_by_time_control(df), use_container_width=True)
-
-    elif selected_section == analysis_options[4]: # ECO & Opening
-        st.subheader("Opening Analysis (Lichess API Names)")
-        n_openings_api = st.slider("Num top openings (API):", 5, 50, 15, key="n_openings_freq_api")
-        st.plotly_chart(plot_opening_frequency(df, top_n=n_openings_api, opening_col='OpeningName_API'), use_container_width=True)
-        min_games_api = st.slider("Min games (API):", 1, 25, 5, key="min_games_perf_api")
-        n_perf_api = st.slider("Num openings by win rate (API):", 5, 50, 15, key="n_openings_perf_api")
-        st.plotly_chart(plot_win_rate_by_opening(df, min_games=min_games_api, top_n=n_perf_api, opening_col='OpeningName_API'), use_container_width=True)
-        st.markdown("---")
-        st.subheader("Opening Analysis (Custom ECO Mapping)")
-        if not eco_mapping: st.warning("Custom ECO mapping file not loaded.")
-        else:
-             n_openings_cust = st.slider("Num top openings (Custom):", 5, 50, 15, key="n_openings_freq_cust")
-             st.plotly_chart(plot_opening_frequency(df, top_n=n_openings_cust, opening_col='OpeningName_Custom'), use_container_width=True)
-             min_games_cust = st.slider("Min games (Custom):", 1, 25, 5, key="min_games_perf_cust")
-             n_perf_cust = st.slider("Num openings by win rate (Custom):", 5, 50, 15, key="n_openings_perf_cust")
-             st.plotly_chart(plot_win_rate_by_opening(df, min_games=min_games_cust, top_n=n_perf_cust, opening_col='OpeningName_Custom'), use_container_width=True)
-
-    elif selected_section == analysis_options[5]: # Opponent
-        st.subheader("Frequent Opponents")
-        n_opponents_freq = st.slider("Num top opponents:", 5, 50, 20, key="n_opponents_freq_opp")
-        st.plotly_chart(plot_most_frequent_opponents(df, top_n=n_opponents_freq), use_container_width=True)
-        st.markdown(f"#### Top {n_opponents_freq} Opponents List")
-        try: st.dataframe(df[df['OpponentName'] != 'Unknown']['OpponentName'].value_counts().reset_index(name='Games').head(n_opponents_freq))
-        except KeyError: st.warning("Could not generate table.")
-        st.subheader("Performance vs Opponent Elo")
-        st.plotly_chart(plot_performance_vs_opponent_elo(df), use_container_width=True)
-
-    elif selected_section == analysis_options[6]: # vs Titled
-        st.subheader("Filter by Opponent Title")
-        selected_titles = st.multiselect("Select Opponent Titles:", TITLES_TO_ANALYZE, default=['GM','IM'])
-        if selected_titles:
-            titled_games = filter_and_analyze_titled(df, selected_titles)
-            if not titled_games.empty:
-                st.success(f"Found **{len(titled_games):,}** games vs selected titles ({', '.join(selected_titles)}). Analyzing subset...")
-                st.plotly_chart(plot_win_loss_pie(titled_games, f"{current_display_name} vs {', '.join(selected_titles)}"), use_container_width=True)
-                st.plotly_chart(plot_win_loss_by_color(titled_games), use_container_width=True)
-                st.plotly_chart(plot_rating_trend(titled_games, f"{current_display_name} (vs {', '.join(selected_titles)})"), use_container_width=True)
-                st.plotly_chart(plot_opening_frequency(titled_games, top_n=15, opening_col='OpeningName_API'), use_container_width=True)
-                st.plotly_chart(plot_most_frequent_opponents(titled_games, top_n=15), use_container_width=True)
-            else: st.warning(f"ℹ️ No games found vs selected titles ({', '.join(selected_titles)}).")
-        else: st.info("Select one or more titles to see the analysis.")
-
-    elif selected_section == analysis_options[7]: # Termination
-        st.subheader("Time Forfeit Analysis")
-        tf_games, wins_tf, losses_tf = filter_and_analyze_time_forfeits(df)
-        if not tf_games.empty:
-            st.plotly_chart(plot_time_forfeit_summary(wins_tf, losses_tf), use_container_width=True)
-            st.plotly_chart(plot_time_forfeit_by_tc(tf_games), use_container_width=True)
-            with st.expander("View Recent Time Forfeit Games"):
-                 st.dataframe(tf_games[['Date','OpponentName','PlayerColor','PlayerResultString','TimeControl','PlyCount','Termination']].sort_values('Date',ascending=False).head(20))
-        else: st.warning("ℹ️ No games found with 'Time forfeit' termination.")
-        st.subheader("Overall Termination Types")
-        termination_counts = df['Termination'].value_counts()
-        fig_term = px.bar(termination_counts, x=termination_counts.index, y=termination_counts.values, title="Game Termination Reasons", labels={'x':'Reason','y':'Count'}, text=termination_counts.values)
-        fig_term.update_layout(dragmode=False); fig_term.update_traces(textposition='outside')
-        st.plotly_chart(fig_term, use_container_width=True)
+    section_renderers[selected_section]()
 
     st.sidebar.markdown("---"); st.sidebar.info(f"Analysis for {current_display_name}.")
 